@@ -0,0 +1,46 @@
+"""
+Renderers for the API
+"""
+import orjson
+
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Render JSON with orjson, matching DRF's JSONRenderer output"""
+    # Stringify int/float/bool/None keys like json.dumps rather than raising,
+    # and leave datetimes to DRF's encoder so UTC keeps its 'Z' suffix
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render data into JSON bytes"""
+        if data is None:
+            return b''
+
+        # orjson can only write compact, unescaped, strict JSON
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if (indent is not None or self.ensure_ascii or not self.compact
+                or not self.strict):
+            return super().render(
+                data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=self.options,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context)
+
+        # orjson writes NaN and infinity as null, let DRF reject them
+        if b'null' in ret:
+            return super().render(
+                data, accepted_media_type, renderer_context)
+
+        # Escaped like DRF so the output stays a JavaScript subset
+        return ret.replace(
+            '\u2028'.encode(), b'\\u2028').replace(
+            '\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,86 @@
+"""
+Tests for the orjson renderer and parser
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONTests(SimpleTestCase):
+    """Test orjson rendering and parsing"""
+
+    def assertRendersLikeDRF(self, data, accepted_media_type=None):
+        """Assert data renders the same as with DRF's JSONRenderer"""
+        self.assertEqual(
+            ORJSONRenderer().render(data, accepted_media_type),
+            JSONRenderer().render(data, accepted_media_type),
+        )
+
+    def test_render_decimal(self):
+        """Test rendering falls back to DRF's encoder for decimals"""
+        res = ORJSONRenderer().render({'price': Decimal('5.25')})
+
+        self.assertEqual(res, b'{"price":5.25}')
+        self.assertRendersLikeDRF({'price': Decimal('5.25')})
+
+    def test_render_datetime(self):
+        """Test datetimes render with DRF's 'Z' suffix for UTC"""
+        data = {'created': datetime(2023, 12, 14, 12, 38, tzinfo=timezone.utc)}
+        res = ORJSONRenderer().render(data)
+
+        self.assertEqual(res, b'{"created":"2023-12-14T12:38:00Z"}')
+        self.assertRendersLikeDRF(data)
+
+    def test_render_nan_raises(self):
+        """Test non-finite floats are rejected like DRF's strict mode"""
+        with self.assertRaises(ValueError):
+            ORJSONRenderer().render({'a': float('nan')})
+
+    def test_render_null(self):
+        """Test real null values still render"""
+        self.assertRendersLikeDRF({'image': None})
+
+    def test_render_indent(self):
+        """Test an indent requested in the media type is honored"""
+        self.assertRendersLikeDRF(
+            {'tags': [{'name': 'Thai'}]}, 'application/json; indent=4')
+
+    def test_render_non_str_keys(self):
+        """Test non-string keys are stringified like json.dumps"""
+        self.assertRendersLikeDRF({1: 'a', 2.5: 'b', None: 'c'})
+
+    def test_render_line_separators(self):
+        """Test U+2028 and U+2029 are escaped like DRF"""
+        self.assertRendersLikeDRF({'name': 'a\u2028b\u2029c'})
+
+    @patch('rest_framework.renderers.JSONRenderer.render')
+    def test_render_plain_data_uses_orjson(self, mock_render):
+        """Test plain data is rendered without falling back to DRF"""
+        res = ORJSONRenderer().render({'tags': [{'id': 1, 'name': 'Thai'}]})
+
+        self.assertEqual(res, b'{"tags":[{"id":1,"name":"Thai"}]}')
+        mock_render.assert_not_called()
+
+    def test_render_none(self):
+        """Test rendering None returns an empty body"""
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_parse_json(self):
+        """Test parsing a JSON body"""
+        res = ORJSONParser().parse(BytesIO(b'{"tags": [{"name": "Thai"}]}'))
+
+        self.assertEqual(res, {'tags': [{'name': 'Thai'}]})
+
+    def test_parse_invalid_json(self):
+        """Test parsing invalid JSON raises a parse error"""
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"tags": '))
@@ -1,6 +1,9 @@
 """Serializers for recipe app
 """
 
+from django.db import connection, transaction
+from django.db.models import Prefetch
+
 from rest_framework import serializers
 
 from core.models import (Recipe, Tag, Ingredient)
@@ -40,44 +43,79 @@ class RecipeSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id',)
 
-    def _get_or_create_tags(self, tags, instance):
-        """Get or create tags"""
-        auth_user = self.context['request'].user
-        for tag in tags:
-            tag, _ = Tag.objects.get_or_create(
-                user=auth_user, **tag)
-            instance.tags.add(tag)
-
-    def _get_or_create_ingredients(self, ingredients, instance):
-        """Get or create ingredients"""
-        auth_user = self.context['request'].user
-        for ingredient in ingredients:
-            ingredient, _ = Ingredient.objects.get_or_create(
-                user=auth_user, **ingredient)
-            instance.ingredients.add(ingredient)
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Prefetch nested objects, list views must call this"""
+        return queryset.prefetch_related(
+            Prefetch('tags', queryset=Tag.objects.only('id', 'name')),
+            Prefetch(
+                'ingredients',
+                queryset=Ingredient.objects.only('id', 'name'),
+            ),
+        )
 
+    def _get_or_create_named(self, model, items, auth_user):
+        """Get or create the user's tags or ingredients by name"""
+        names = list(dict.fromkeys(item['name'] for item in items))
+        existing = {
+            obj.name: obj
+            for obj in model.objects.filter(user=auth_user, name__in=names)
+        }
+        missing = [name for name in names if name not in existing]
+        if missing:
+            created = model.objects.bulk_create(
+                model(user=auth_user, name=name) for name in missing)
+            # Postgres returns the new pks from bulk_create, but on Django
+            # 3.2 SQLite doesn't, so the new rows are selected again there
+            if not connection.features.can_return_rows_from_bulk_insert:
+                created = model.objects.filter(
+                    user=auth_user, name__in=missing)
+            existing.update((obj.name, obj) for obj in created)
+        return list(existing.values())
+
+    @transaction.atomic
     def create(self, validated_data):
         """Create a new recipe"""
         tags = validated_data.pop('tags', [])
         ingredients = validated_data.pop('ingredients', [])
         recipe = Recipe.objects.create(**validated_data)
 
-        self._get_or_create_tags(tags, recipe)
-        self._get_or_create_ingredients(ingredients, recipe)
+        # A new recipe has no existing links, so skip add()'s lookup for them.
+        # Writing the through rows directly doesn't send m2m_changed, unlike
+        # the set() calls in update(); don't rely on that signal on create.
+        auth_user = self.context['request'].user
+        if tags:
+            RecipeTag = Recipe.tags.through
+            RecipeTag.objects.bulk_create(
+                RecipeTag(recipe=recipe, tag=tag)
+                for tag in self._get_or_create_named(Tag, tags, auth_user)
+            )
+        if ingredients:
+            RecipeIngredient = Recipe.ingredients.through
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(recipe=recipe, ingredient=ingredient)
+                for ingredient in self._get_or_create_named(
+                    Ingredient, ingredients, auth_user)
+            )
 
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Update a recipe"""
         tags = validated_data.pop('tags', None)
         ingredients = validated_data.pop('ingredients', None)
-        if tags is not None:
+        auth_user = self.context['request'].user
+        if tags:
+            instance.tags.set(self._get_or_create_named(Tag, tags, auth_user))
+        elif tags is not None:
             instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
 
-        if ingredients is not None:
+        if ingredients:
+            instance.ingredients.set(self._get_or_create_named(
+                Ingredient, ingredients, auth_user))
+        elif ingredients is not None:
             instance.ingredients.clear()
-            self._get_or_create_ingredients(ingredients, instance)
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
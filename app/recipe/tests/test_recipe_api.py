@@ -1,12 +1,17 @@
-"""Tests for recipe API endpoints"""
+"""Tests for recipe API endpoints
+
+Keep these on TestCase, which rolls each test back to a savepoint.
+TransactionTestCase flushes every table between tests; only move a test
+to its own TransactionTestCase class if it needs data to be committed.
+"""
 
 from decimal import Decimal
-# import tempfile
+# import io
 # import os
-
-# from PIL import Image
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+# from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 from django.urls import reverse
 
@@ -18,31 +23,41 @@ from core.models import (Recipe, Tag, Ingredient)
 from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
 
 RECIPES_URL = reverse('recipe:recipe-list')
+RECIPE_DETAIL_URL = reverse(
+    'recipe:recipe-detail', args=[0]).replace('/0/', '/{}/')
+RECIPE_UPLOAD_IMAGE_URL = reverse(
+    'recipe:recipe-upload-image', args=[0]).replace('/0/', '/{}/')
+
+DEFAULT_PRICE = Decimal('5.25')
+RECIPE_DEFAULTS = {
+    'title': 'Sample Recipe',
+    'time_minutes': 22,
+    'price': DEFAULT_PRICE,
+    'description': 'Sample recipe description',
+    'link': 'https://example.com/recipe.pdf',
+}
 
 
 def detail_url(recipe_id):
     """Return recipe detail URL"""
-    return reverse('recipe:recipe-detail', args=[recipe_id])
+    return RECIPE_DETAIL_URL.format(recipe_id)
 
 
 def image_upload_url(recipe_id):
     """Return URL for recipe image upload"""
-    return reverse('recipe:recipe-upload-image', args=[recipe_id])
+    return RECIPE_UPLOAD_IMAGE_URL.format(recipe_id)
 
 
 def create_recipe(user, **params):
     """Helper function to create a recipe"""
-    defaults = {
-        'title': 'Sample Recipe',
-        'time_minutes': 22,
-        'price': Decimal('5.25'),
-        'description': 'Sample recipe description',
-        'link': 'https://example.com/recipe.pdf',
-    }
-    defaults.update(params)
+    return Recipe.objects.create(user=user, **(RECIPE_DEFAULTS | params))
 
-    recipe = Recipe.objects.create(user=user, **defaults)
-    return recipe
+
+def create_recipes(user, count, **params):
+    """Helper function to create several recipes in a single query"""
+    defaults = RECIPE_DEFAULTS | params
+    return Recipe.objects.bulk_create(
+        Recipe(user=user, **defaults) for _ in range(count))
 
 
 def create_user(**params):
@@ -52,40 +67,46 @@ def create_user(**params):
 
 class PublicRecipeApiTests(TestCase):
     """Test unauthenticated recipe API access"""
+    client_class = APIClient
 
-    def setUp(self):
-        self.client = APIClient()
-
-    def test_auth_required(self):
+    @patch('recipe.views.RecipeViewSet.get_queryset')
+    def test_auth_required(self, mock_get_queryset):
         """Test that authentication is required"""
         res = self.client.get(RECIPES_URL)
 
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        mock_get_queryset.assert_not_called()
 
 
 class PrivateRecipeApiTests(TestCase):
     """Test authenticated recipe API access"""
+    client_class = APIClient
 
-    def setUp(self):
-        self.client = APIClient()
-        self.user = create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
             email='user@example.com',
             password='testpass123',
         )
+
+    def setUp(self):
         self.client.force_authenticate(self.user)
 
     def test_retrieve_recipes(self):
         """Test retrieving a list of recipes"""
-        create_recipe(user=self.user)
-        create_recipe(user=self.user)
+        create_recipes(user=self.user, count=2)
 
-        res = self.client.get(RECIPES_URL)
+        # One query for the recipes plus one per prefetched relation
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL)
 
-        recipes = Recipe.objects.all().order_by('-id')
-        serializer = RecipeSerializer(recipes, many=True)
+        recipe_ids = list(
+            Recipe.objects.order_by('-id').values_list('id', flat=True))
+        serializer = RecipeSerializer(Recipe.objects.get(id=recipe_ids[0]))
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual([recipe['id'] for recipe in res.data], recipe_ids)
+        self.assertEqual(res.data[0], serializer.data)
 
     def test_recipes_limited_to_user(self):
         """Test retrieving recipes for user"""
@@ -98,7 +119,8 @@ class PrivateRecipeApiTests(TestCase):
 
         res = self.client.get(RECIPES_URL)
 
-        recipes = Recipe.objects.filter(user=self.user)
+        recipes = RecipeSerializer.setup_eager_loading(
+            Recipe.objects.filter(user=self.user))
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -184,12 +206,13 @@ class PrivateRecipeApiTests(TestCase):
             'user': user2.id,
         }
         url = detail_url(recipe.id)
-        self.client.patch(url, payload)
+        with patch.object(Recipe, 'save', autospec=True) as mock_save:
+            self.client.patch(url, payload)
 
-        recipe.refresh_from_db()
-
-        self.assertEqual(recipe.user, self.user)
-        self.assertNotEqual(recipe.user, user2)
+        mock_save.assert_called_once()
+        saved_recipe = mock_save.call_args.args[0]
+        self.assertEqual(saved_recipe.user, self.user)
+        self.assertNotEqual(saved_recipe.user, user2)
 
     def test_delete_recipe(self):
         """Test deleting a recipe"""
@@ -198,7 +221,6 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.delete(url)
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertFalse(Recipe.objects.filter(id=recipe.id).exists())
         self.assertEqual(Recipe.objects.filter(id=recipe.id).count(), 0)
 
     def test_delete_other_users_recipe_error(self):
@@ -209,7 +231,6 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.delete(url)
 
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
-        self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
         self.assertEqual(Recipe.objects.filter(id=recipe.id).count(), 1)
 
     def test_create_recipe_with_tags(self):
@@ -221,11 +242,15 @@ class PrivateRecipeApiTests(TestCase):
             'description': 'Sample recipe description',
             'tags': [{'name': 'Thai'}, {'name': 'Dinner'}],
         }
-        res = self.client.post(RECIPES_URL, payload, format='json')
+        # Savepoint and release (2), recipe INSERT (1), tag SELECT, bulk
+        # INSERT and re-select of the new rows on SQLite (3), through-table
+        # INSERT (1), nested tags and ingredients for the response (2)
+        with self.assertNumQueries(9):
+            res = self.client.post(RECIPES_URL, payload, format='json')
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
-        recipes = Recipe.objects.filter(user=self.user)
-        self.assertEqual(recipes.count(), 1)
+        recipes = list(Recipe.objects.filter(user=self.user))
+        self.assertEqual(len(recipes), 1)
         recipe = recipes[0]
         self.assertEqual(recipe.tags.count(), 2)
         for tag in payload['tags']:
@@ -250,8 +275,8 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.post(RECIPES_URL, payload, format='json')
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
-        recipes = Recipe.objects.filter(user=self.user)
-        self.assertEqual(recipes.count(), 1)
+        recipes = list(Recipe.objects.filter(user=self.user))
+        self.assertEqual(len(recipes), 1)
         recipe = recipes[0]
         self.assertEqual(recipe.tags.count(), 2)
         self.assertIn(tag_indian, recipe.tags.all())
@@ -284,7 +309,11 @@ class PrivateRecipeApiTests(TestCase):
             'tags': [{'name': 'Lunch'}],
         }
         url = detail_url(recipe.id)
-        res = self.client.patch(url, payload, format='json')
+        # Recipe lookup (1), savepoint and release (2), a single tag SELECT
+        # (1), set() diff: current ids, DELETE and INSERT (3), recipe
+        # UPDATE (1), nested tags and ingredients for the response (2)
+        with self.assertNumQueries(10):
+            res = self.client.patch(url, payload, format='json')
 
         recipe.refresh_from_db()
         self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -319,8 +348,8 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.post(RECIPES_URL, payload, format='json')
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
-        recipes = Recipe.objects.filter(user=self.user)
-        self.assertEqual(recipes.count(), 1)
+        recipes = list(Recipe.objects.filter(user=self.user))
+        self.assertEqual(len(recipes), 1)
         recipe = recipes[0]
         self.assertEqual(recipe.ingredients.count(), 2)
         for ingredient in payload['ingredients']:
@@ -342,8 +371,8 @@ class PrivateRecipeApiTests(TestCase):
         res = self.client.post(RECIPES_URL, payload, format='json')
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
-        recipes = Recipe.objects.filter(user=self.user)
-        self.assertEqual(recipes.count(), 1)
+        recipes = list(Recipe.objects.filter(user=self.user))
+        self.assertEqual(len(recipes), 1)
         recipe = recipes[0]
         self.assertEqual(recipe.ingredients.count(), 2)
         self.assertIn(ingredient_salt, recipe.ingredients.all())
@@ -405,13 +434,23 @@ class PrivateRecipeApiTests(TestCase):
 
 # class ImageUploadTests(TestCase):
 #     """Test image upload"""
+#     client_class = APIClient
+
+#     @classmethod
+#     def setUpTestData(cls):
+#         # Imported here so only workers that run image tests load PIL
+#         from PIL import Image
+#
+#         cls.user = create_user(
+#             email='user@example.com',
+#             password='testpass123',
+#         )
+#         # Encode the sample JPEG once rather than in every test
+#         buffer = io.BytesIO()
+#         Image.new('RGB', (10, 10)).save(buffer, format='JPEG')
+#         cls.jpeg_bytes = buffer.getvalue()
 
 #     def setUp(self):
-#         self.client = APIClient()
-#         self.user = get_user_model().objects.create_user(
-#             'user@example.com',
-#             'testpass123'
-#         )
 #         self.client.force_authenticate(self.user)
 #         self.recipe = create_recipe(user=self.user)
 
@@ -422,12 +461,10 @@ class PrivateRecipeApiTests(TestCase):
 #     def test_upload_image_to_recipe(self):
 #         """Test uploading an image to recipe"""
 #         url = image_upload_url(self.recipe.id)
-#         with tempfile.NamedTemporaryFile(suffix='.jpg') as ntf:
-#             image = Image.new('RGB', (10, 10))
-#             image.save(ntf, format='JPEG')
-#             ntf.seek(0)
-#             payload = {'image': ntf}
-#             res = self.client.post(url, payload, format='multipart')
+#         image = SimpleUploadedFile(
+#             'image.jpg', self.jpeg_bytes, content_type='image/jpeg')
+#         payload = {'image': image}
+#         res = self.client.post(url, payload, format='multipart')
 
 #         self.recipe.refresh_from_db()
 #         self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -40,7 +40,12 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Return objects for the current authenticated user only"""
-        return self.queryset.filter(user=self.request.user).order_by('-id')
+        queryset = self.queryset.filter(
+            user=self.request.user).order_by('-id')
+        if self.action == 'list':
+            return serializers.RecipeSerializer.setup_eager_loading(queryset)
+
+        return queryset
 
     def get_serializer_class(self):
         """Return appropriate serializer class"""